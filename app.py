@@ -1,9 +1,44 @@
 from flask import Flask, jsonify, request
+import os
+import queue
+import threading
+import uuid
 import requests
+from collections import OrderedDict
 from datetime import datetime
+from openfoodfacts_index import BarcodeIndex
 
 app = Flask(__name__)
 
+OpenFoodFacts_base_url = "https://world.openfoodfacts.org"
+OPENFOODFACTS_TIMEOUT = 5
+
+# Offline index built with openfoodfacts_index.py; checked before the live API
+offline_index = None
+if os.environ.get('OPENFOODFACTS_INDEX'):
+    offline_index = BarcodeIndex(os.environ['OPENFOODFACTS_INDEX'])
+
+# Barcode-only items are created right away and filled in by background workers
+ENRICHMENT_WORKERS = 4
+ENRICHMENT_BATCH_SIZE = 20
+ENRICHMENT_QUEUE_SIZE = 1000
+# Finished statuses kept for GET /inventory/<id>/enrichment; the oldest are forgotten first
+ENRICHMENT_STATUS_LIMIT = 10000
+
+# Fields filled in from OpenFoodFacts and the placeholder they hold until then
+ENRICHED_FIELDS = {
+    "product_name": "Unknown",
+    "brands": "Unknown",
+    "category": "Uncategorized"
+}
+
+enrichment_queue = queue.Queue(maxsize=ENRICHMENT_QUEUE_SIZE)
+# Pending items are bounded by the queue size, finished ones by ENRICHMENT_STATUS_LIMIT
+enrichment_pending = set()
+enrichment_results = OrderedDict()
+enrichment_workers = []
+enrichment_lock = threading.Lock()
+
 inventory = [
     {
         "id": 1,
@@ -53,6 +88,24 @@ inventory = [
 ]
 
 next_id = 6
+next_id_lock = threading.Lock()
+
+# Bumped on every change so clients can revalidate GET /inventory with an ETag.
+# The per-process prefix keeps a restarted server from matching stale tags.
+inventory_version = 0
+inventory_etag_prefix = uuid.uuid4().hex[:8]
+
+def allocate_id():
+    """Hand out the next item id; requests are served concurrently, so this must be atomic"""
+    global next_id
+    with next_id_lock:
+        item_id = next_id
+        next_id += 1
+    return item_id
+
+def inventory_changed():
+    global inventory_version
+    inventory_version += 1
 
 def find_item_id(id):
     for item in inventory:
@@ -60,28 +113,133 @@ def find_item_id(id):
             return item
     return None
 
+def lookup_openfoodfacts(barcode):
+    """Return product data, or None if OpenFoodFacts has no such product.
+
+    Raises requests.exceptions.RequestException if the lookup itself failed.
+    """
+    if offline_index is not None:
+        product = offline_index.lookup(barcode)
+        if product:
+            return product
+
+    url = f"{OpenFoodFacts_base_url}/api/v0/product/{barcode}.json"
+    response = requests.get(url, timeout=OPENFOODFACTS_TIMEOUT)
+
+    # Unknown products come back as 200 with status 0, so any other response
+    # (rate limiting, outages) is a failed lookup rather than a miss
+    if response.status_code != 200:
+        response.raise_for_status()
+        raise requests.exceptions.HTTPError(
+            f"Unexpected status {response.status_code} from OpenFoodFacts", response=response
+        )
+
+    data = response.json()
+
+    if data.get('status') == 1:
+        product = data.get('product', {})
+        return {
+            "product_name": product.get('product_name', 'Unknown'),
+            "brands": product.get('brands', 'Unknown'),
+            "barcode": barcode,
+            "category": product.get('categories', 'Uncategorized'),
+        }
+    return None
+
 def fetch_openfoodfacts_data(barcode):
     try:
-        url = f"https://world.openfoodfacts.org/api/v0/product/{barcode}.json"
-        response = requests.get(url)
-
-        if response.status_code == 200:
-            data = response.json()
-
-            if data.get('status') == 1:
-                product = data.get('product', {})
-                return {
-                    "product_name": product.get('product_name', 'Unknown'),
-                    "brands": product.get('brands', 'Unknown'),
-                    "barcode": barcode,
-                    "category": product.get('categories', 'Uncategorized'),
-                }
-        return None
-    
+        return lookup_openfoodfacts(barcode)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching data from OpenFoodFacts: {e}")
         return None
+
+def get_enrichment_status_of(item_id):
+    if item_id in enrichment_pending:
+        return "pending"
+    return enrichment_results.get(item_id, "not_requested")
+
+def finish_enrichment(item_id, status):
+    with enrichment_lock:
+        # Already finished, or the item was deleted while it was being looked up
+        if item_id not in enrichment_pending:
+            return
+        enrichment_pending.discard(item_id)
+        enrichment_results[item_id] = status
+        enrichment_results.move_to_end(item_id)
+        while len(enrichment_results) > ENRICHMENT_STATUS_LIMIT:
+            enrichment_results.popitem(last=False)
+
+def forget_enrichment(item_id):
+    with enrichment_lock:
+        enrichment_pending.discard(item_id)
+        enrichment_results.pop(item_id, None)
     
+def next_enrichment_batch():
+    """Block for one queued item, then take whatever else is waiting up to the batch size"""
+    batch = [enrichment_queue.get()]
+    while len(batch) < ENRICHMENT_BATCH_SIZE:
+        try:
+            batch.append(enrichment_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+def enrich_batch(batch):
+    # Scanners often send the same barcode repeatedly, so look each one up once.
+    # A failed lookup is stored as the exception so it isn't mistaken for "not found".
+    products = {}
+    for item_id, barcode, fields in batch:
+        if barcode not in products:
+            try:
+                products[barcode] = lookup_openfoodfacts(barcode)
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching data from OpenFoodFacts: {e}")
+                products[barcode] = e
+
+    for item_id, barcode, fields in batch:
+        item = find_item_id(item_id)
+        if not item:
+            forget_enrichment(item_id)
+            continue
+
+        product = products[barcode]
+        if isinstance(product, Exception):
+            finish_enrichment(item_id, "failed")
+            continue
+        if not product:
+            finish_enrichment(item_id, "not_found")
+            continue
+
+        for field in fields:
+            # Leave fields alone if they were updated while the item was queued
+            if item[field] == ENRICHED_FIELDS[field]:
+                item[field] = product[field]
+        finish_enrichment(item_id, "done")
+        inventory_changed()
+
+def enrichment_worker():
+    while True:
+        batch = next_enrichment_batch()
+        try:
+            enrich_batch(batch)
+        except Exception as e:
+            print(f"Error enriching items: {e}")
+            # Only items still pending are marked; finished or deleted ones are left alone
+            for item_id, _, _ in batch:
+                finish_enrichment(item_id, "failed")
+        finally:
+            for _ in batch:
+                enrichment_queue.task_done()
+
+def start_enrichment_workers():
+    with enrichment_lock:
+        if enrichment_workers:
+            return
+        for _ in range(ENRICHMENT_WORKERS):
+            worker = threading.Thread(target=enrichment_worker, daemon=True)
+            worker.start()
+            enrichment_workers.append(worker)
+
 @app.route('/')
 def home():
     return jsonify({
@@ -92,6 +250,7 @@ def home():
             "POST /inventory": "Add a new item",
             "PATCH /inventory/<id>": "Update an existing item",
             "DELETE /inventory/<id>": "Delete an item",
+            "GET /inventory/<id>/enrichment": "Check OpenFoodFacts enrichment of a barcode-only item",
             "GET /openfoodfacts/<barcode>": "Fetch product from OpenFoodFacts"
         }
     })
@@ -99,7 +258,16 @@ def home():
 
 @app.route('/inventory', methods=['GET'])
 def get_all_inventory():
-    return jsonify(inventory), 200
+    etag = f"{inventory_etag_prefix}-{inventory_version}"
+    
+    # Skip serializing the whole inventory when the client's copy is current
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify(inventory)
+    
+    response.set_etag(etag)
+    return response
 
 
 @app.route('/inventory/<int:item_id>', methods=['GET'])
@@ -114,21 +282,22 @@ def get_inventory_item(item_id):
 
 @app.route('/inventory', methods=['POST'])
 def add_inventory_item():
-    global next_id
-    
     # Get JSON data from request
     data = request.get_json()
     
+    # Items with a barcode but no name are enriched from OpenFoodFacts in the background
+    enrich = 'product_name' not in data and bool(data.get('barcode'))
+    
     # Validate required fields
-    required_fields = ['product_name', 'quantity', 'price']
+    required_fields = ['quantity', 'price'] if enrich else ['product_name', 'quantity', 'price']
     for field in required_fields:
         if field not in data:
             return jsonify({"error": f"Missing required field: {field}"}), 400
     
     # Create new item
     new_item = {
-        "id": next_id,
-        "product_name": data.get('product_name'),
+        "id": allocate_id(),
+        "product_name": data.get('product_name', 'Unknown'),
         "brands": data.get('brands', 'Unknown'),
         "barcode": data.get('barcode', ''),
         "quantity": data.get('quantity'),
@@ -138,9 +307,24 @@ def add_inventory_item():
     
     # Add to inventory
     inventory.append(new_item)
-    next_id += 1
+    inventory_changed()
+    
+    if not enrich:
+        return jsonify(new_item), 201
+    
+    fields = [field for field in ENRICHED_FIELDS if field not in data]
+    enrichment_pending.add(new_item['id'])
+    try:
+        enrichment_queue.put_nowait((new_item['id'], new_item['barcode'], fields))
+    except queue.Full:
+        inventory.remove(new_item)
+        inventory_changed()
+        forget_enrichment(new_item['id'])
+        return jsonify({"error": "Enrichment queue is full, try again later"}), 503
     
-    return jsonify(new_item), 201
+    start_enrichment_workers()
+    
+    return jsonify(new_item), 202
 
 
 @app.route('/inventory/<int:item_id>', methods=['PATCH'])
@@ -162,25 +346,44 @@ def update_inventory_item(item_id):
     for field in allowed_fields:
         if field in data:
             item[field] = data[field]
+    inventory_changed()
     
     return jsonify(item), 200
 
 
 @app.route('/inventory/<int:item_id>', methods=['DELETE'])
 def delete_inventory_item(item_id):
-    global inventory
-    
     item = find_item_id(item_id)
     
     if not item:
         return jsonify({"error": "Item not found"}), 404
     
     # Remove item from inventory
-    inventory = [i for i in inventory if i['id'] != item_id]
+    # In place, so items appended by concurrent requests aren't lost
+    try:
+        inventory.remove(item)
+    except ValueError:
+        return jsonify({"error": "Item not found"}), 404
+    inventory_changed()
+    forget_enrichment(item_id)
     
     return jsonify({"message": f"Item {item_id} deleted successfully"}), 200
 
 
+@app.route('/inventory/<int:item_id>/enrichment', methods=['GET'])
+def get_enrichment_status(item_id):
+    item = find_item_id(item_id)
+    
+    if not item:
+        return jsonify({"error": "Item not found"}), 404
+    
+    return jsonify({
+        "id": item_id,
+        "status": get_enrichment_status_of(item_id),
+        "queue_depth": enrichment_queue.qsize()
+    }), 200
+
+
 @app.route('/openfoodfacts/<barcode>', methods=['GET'])
 def get_openfoodfacts_product(barcode):
     product_data = fetch_openfoodfacts_data(barcode)
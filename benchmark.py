@@ -0,0 +1,331 @@
+"""Benchmark and load-test suite for the inventory API.
+
+Seeds the store with a fixed number of items, serves app.py and a local
+OpenFoodFacts stub over real HTTP, drives every route at the requested
+concurrency and prints the results as JSON.
+
+The app and the stub each run in their own process so the load generator
+doesn't compete with them for the GIL, and peak memory is the app server's
+own high-water mark for each size.
+
+    python benchmark.py --sizes 10000,100000,1000000 --concurrency 8
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from flask import Flask, jsonify
+from werkzeug.serving import make_server
+
+import app as inventory_app
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+SERVER_START_TIMEOUT = 600
+ENRICHMENT_DRAIN_TIMEOUT = 300
+CATEGORIES = ['Beverages', 'Bakery', 'Dairy', 'Spreads', 'Snacks', 'Frozen']
+
+stub_app = Flask('openfoodfacts_stub')
+
+
+@stub_app.route('/api/v0/product/<barcode>.json')
+def stub_product(barcode):
+    return jsonify({
+        'status': 1,
+        'product': {
+            'product_name': f'Stub Product {barcode}',
+            'brands': 'Stub Brand',
+            'categories': 'Stub Category'
+        }
+    })
+
+
+def make_items(size, seed=0):
+    """Build `size` inventory items deterministically from `seed`"""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "product_name": f"Product {i}",
+            "brands": f"Brand {rng.randrange(500)}",
+            "barcode": f"{rng.randrange(10 ** 12):012d}",
+            "quantity": rng.randrange(100),
+            "price": round(rng.uniform(0.5, 50), 2),
+            "category": rng.choice(CATEGORIES)
+        }
+        for i in range(1, size + 1)
+    ]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def peak_memory_mb():
+    """Peak resident set size of the calling process, or None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    if sys.platform == 'darwin':
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def serve(name, size, seed, openfoodfacts_url, results, stop):
+    """Server process entry point.
+
+    Puts the listening port on `results`, serves until `stop` is set, then
+    puts this process's peak memory on `results`.
+    """
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    if name == 'app':
+        inventory_app.inventory = make_items(size, seed)
+        inventory_app.next_id = size + 1
+        inventory_app.OpenFoodFacts_base_url = openfoodfacts_url
+        wsgi_app = inventory_app.app
+    else:
+        wsgi_app = stub_app
+
+    server = make_server('127.0.0.1', 0, wsgi_app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    results.put(server.server_port)
+
+    stop.wait()
+    server.shutdown()
+    thread.join()
+    results.put(peak_memory_mb())
+
+
+class ServerProcess:
+    """Run the app ('app') or the OpenFoodFacts stub ('stub') on an ephemeral local port"""
+
+    # spawn gives every server a fresh interpreter instead of a copy of this one
+    context = multiprocessing.get_context('spawn')
+
+    def __init__(self, name, size=0, seed=0, openfoodfacts_url=None):
+        self.results = self.context.Queue()
+        self.stop = self.context.Event()
+        self.process = self.context.Process(
+            target=serve, args=(name, size, seed, openfoodfacts_url, self.results, self.stop), daemon=True
+        )
+        self.url = None
+        self.peak_memory_mb = None
+
+    def __enter__(self):
+        self.process.start()
+        self.url = f'http://127.0.0.1:{self.results.get(timeout=SERVER_START_TIMEOUT)}'
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        try:
+            self.peak_memory_mb = self.results.get(timeout=30)
+        finally:
+            self.process.join(timeout=30)
+            if self.process.is_alive():
+                self.process.terminate()
+
+
+def route_plans(size, requests_per_route, list_requests):
+    """Return (name, method, path builder, body builder, count) per route.
+
+    PATCH and DELETE use disjoint id ranges so every request hits an
+    existing item, and DELETE never touches an id that PATCH still needs.
+    Barcode-only items get the ids after the named POSTs, which is what the
+    enrichment status route then polls.
+    """
+    half = max(size // 2, 1)
+    item = {"product_name": "Benchmark Item", "quantity": 1, "price": 1.0}
+    first_barcode_id = size + requests_per_route + 1
+    return [
+        ('GET /', 'GET', lambda n: '/', None, requests_per_route),
+        ('GET /inventory', 'GET', lambda n: '/inventory', None, list_requests),
+        ('GET /inventory/<id>', 'GET',
+         lambda n: f'/inventory/{n % size + 1}', None, requests_per_route),
+        ('POST /inventory', 'POST', lambda n: '/inventory', lambda n: item, requests_per_route),
+        ('POST /inventory (barcode only)', 'POST', lambda n: '/inventory',
+         lambda n: {"barcode": f"{n:012d}", "quantity": 1, "price": 1.0}, requests_per_route),
+        ('GET /inventory/<id>/enrichment', 'GET',
+         lambda n: f'/inventory/{first_barcode_id + n % max(requests_per_route, 1)}/enrichment', None,
+         requests_per_route),
+        ('PATCH /inventory/<id>', 'PATCH',
+         lambda n: f'/inventory/{n % half + 1}', lambda n: {"quantity": n}, requests_per_route),
+        ('DELETE /inventory/<id>', 'DELETE',
+         lambda n: f'/inventory/{half + 1 + n % max(size - half, 1)}', None,
+         min(requests_per_route, size - half)),
+        ('GET /openfoodfacts/<barcode>', 'GET',
+         lambda n: f'/openfoodfacts/{n:012d}', None, requests_per_route),
+    ]
+
+
+def drive_route(base_url, method, path, body, count, concurrency):
+    """Issue `count` requests and return latency and throughput stats"""
+    local = threading.local()
+
+    def one(n):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        json_body = body(n) if body else None
+        start = time.perf_counter()
+        response = session.request(method, base_url + path(n), json=json_body)
+        elapsed = time.perf_counter() - start
+        return elapsed, response.status_code < 400
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(count)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(elapsed * 1000 for elapsed, _ in results)
+    return {
+        "requests": count,
+        "errors": sum(1 for _, ok in results if not ok),
+        "rps": round(count / wall, 1) if wall else None,
+        "p50_ms": round(percentile(latencies, 50), 3) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 3) if latencies else None,
+    }
+
+
+def drain_enrichment(base_url, item_ids, started):
+    """Wait for the barcode-only items to leave "pending" and return enrichment throughput"""
+    session = requests.Session()
+    pending = list(item_ids)
+    deadline = time.perf_counter() + ENRICHMENT_DRAIN_TIMEOUT
+
+    while pending and time.perf_counter() < deadline:
+        pending = [
+            item_id for item_id in pending
+            if session.get(f'{base_url}/inventory/{item_id}/enrichment').json().get('status') == 'pending'
+        ]
+        if pending:
+            time.sleep(0.01)
+
+    elapsed = time.perf_counter() - started
+    done = len(item_ids) - len(pending)
+    return {
+        "items": len(item_ids),
+        "pending": len(pending),
+        "drain_s": round(elapsed, 3),
+        "items_per_s": round(done / elapsed, 1) if elapsed else None,
+    }
+
+
+def run_size(size, concurrency, requests_per_route, list_requests, seed=0):
+    """Seed a fresh app server with `size` items and benchmark every route"""
+    with ServerProcess('stub') as stub:
+        with ServerProcess('app', size, seed, stub.url) as server:
+            routes = {}
+            enrichment = None
+            for name, method, path, body, count in route_plans(size, requests_per_route, list_requests):
+                started = time.perf_counter()
+                routes[name] = drive_route(server.url, method, path, body, count, concurrency)
+
+                # Background enrichment is the throughput that matters for scanners:
+                # time from the first barcode-only POST until every item is enriched
+                if name == 'POST /inventory (barcode only)':
+                    first_id = size + requests_per_route + 1
+                    enrichment = drain_enrichment(server.url, range(first_id, first_id + count), started)
+
+    return {
+        "size": size,
+        "routes": routes,
+        "enrichment": enrichment,
+        "server_peak_memory_mb": server.peak_memory_mb,
+    }
+
+
+def run_benchmark(sizes, concurrency, requests_per_route, list_requests, seed=0):
+    results = [
+        run_size(size, concurrency, requests_per_route, list_requests, seed)
+        for size in sorted(sizes)
+    ]
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "sizes": sorted(sizes),
+            "concurrency": concurrency,
+            "requests_per_route": requests_per_route,
+            "list_requests": list_requests,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the inventory API')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='comma separated store sizes to seed (default: %(default)s)')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='concurrent client threads (default: %(default)s)')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='requests per route (default: %(default)s)')
+    parser.add_argument('--list-requests', type=int, default=10,
+                        help='requests for GET /inventory, which returns the whole store (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed for generated items (default: %(default)s)')
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    try:
+        args.sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    except ValueError:
+        parser.error(f'--sizes must be comma separated integers, got {args.sizes!r}')
+    if not args.sizes or any(size <= 0 for size in args.sizes):
+        parser.error('--sizes must all be positive')
+
+    for option in ('concurrency', 'requests', 'list_requests'):
+        if getattr(args, option) <= 0:
+            parser.error(f"--{option.replace('_', '-')} must be positive")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    report = run_benchmark(args.sizes, args.concurrency, args.requests, args.list_requests, args.seed)
+    output = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
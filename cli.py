@@ -1,9 +1,24 @@
 import requests
+import argparse
 import json
+import os
+import sys
+import threading
+import time
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Optional
+from urllib.parse import quote
 
 API_base_url = "http://localhost:8000"
 
+# Local copy of the inventory, revalidated against the server's ETag
+CACHE_PATH = os.path.expanduser("~/.food_inventory_cache.json")
+PAGE_SIZE = 50
+
+inventory_cache = None
+
 def heading(text):
     print(text)
     print('=' * 70)
@@ -17,8 +32,16 @@ def print_single_item(item):
     print(f'Price: {item["price"]}')
     print(f'Cateogry: {item["category"]}')
 
-def print_all_items(items):
-    """Display all inventory items in a formatted table"""
+def format_rows(items):
+    """Lazily format table rows so only the rows actually shown are built"""
+    for item in items:
+        name = item['product_name'][:28] + '..' if len(item['product_name']) > 30 else item['product_name']
+        brand = item['brands'][:18] + '..' if len(item['brands']) > 20 else item['brands']
+        
+        yield f"{item['id']:<5} {name:<30} {brand:<20} {item['quantity']:<8} ${item['price']:<9.2f}"
+
+def print_all_items(items, page_size=PAGE_SIZE):
+    """Display inventory items in a formatted table, one page at a time"""
     
     if not items:
         print('\n❌ No items found in inventory')
@@ -27,11 +50,18 @@ def print_all_items(items):
     print(f"\n{'ID':<5} {'Name':<30} {'Brand':<20} {'Qty':<8} {'Price':<10}")
     print('-' * 80)
     
-    for item in items:
-        name = item['product_name'][:28] + '..' if len(item['product_name']) > 30 else item['product_name']
-        brand = item['brands'][:18] + '..' if len(item['brands']) > 20 else item['brands']
-        
-        print(f"{item['id']:<5} {name:<30} {brand:<20} {item['quantity']:<8} ${item['price']:<9.2f}")
+    rows = format_rows(items)
+    shown = 0
+    while True:
+        page = list(islice(rows, page_size))
+        if page:
+            print('\n'.join(page))
+            shown += len(page)
+        if shown >= len(items):
+            break
+        more = input(f'-- {shown}/{len(items)} shown, Enter for more, q to stop: ').strip().lower()
+        if more == 'q':
+            break
     
     print(f"Total items: {len(items)}")
 
@@ -45,16 +75,97 @@ def error_response(response):
         print(response.status_code)
 
 
+def load_cache():
+    """Return the cached {"etag", "items"} for this server, or None"""
+    global inventory_cache
+    
+    if inventory_cache is None:
+        try:
+            with open(CACHE_PATH) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        # Anything else is a cache miss; the next successful fetch overwrites it
+        if not (isinstance(cache, dict) and isinstance(cache.get('etag'), str)
+                and isinstance(cache.get('items'), list)):
+            return None
+        inventory_cache = cache
+    
+    if inventory_cache.get('base_url') != API_base_url:
+        return None
+    return inventory_cache
+
+
+def save_cache(etag, items):
+    global inventory_cache
+    inventory_cache = {'base_url': API_base_url, 'etag': etag, 'items': items}
+    
+    try:
+        # Write then rename so an interrupted save never leaves a corrupt cache
+        tmp_path = f'{CACHE_PATH}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(inventory_cache, f)
+        os.replace(tmp_path, CACHE_PATH)
+    except (OSError, TypeError, ValueError) as e:
+        print(f'Could not save inventory cache: {e}')
+
+
+def fetch_inventory():
+    """Return the inventory, only downloading it if the cached copy is stale.
+
+    Falls back to the cached copy when the server can't be reached.
+    """
+    cache = load_cache()
+    headers = {'If-None-Match': cache['etag']} if cache else {}
+    
+    try:
+        response = requests.get(f'{API_base_url}/inventory', headers=headers)
+    except requests.exceptions.RequestException:
+        if not cache:
+            raise
+        print('Server unreachable, showing cached copy')
+        return cache['items']
+    
+    if response.status_code == 304 and cache:
+        return cache['items']
+    if response.status_code == 200:
+        items = response.json()
+        etag = response.headers.get('ETag')
+        if etag:
+            save_cache(etag, items)
+        return items
+    
+    error_response(response)
+    return None
+
+
 def get_inventory():
     try:
-        response = requests.get(f'{API_base_url}/inventory')
+        items = fetch_inventory()
 
-        if response.status_code == 200:
-            items = response.json()
+        if items is not None:
             heading('Inventory')
             print_all_items(items)
-        else:
-            error_response(response)
+    except Exception as e:
+        print(f'Error: {e}')
+
+def filter_inventory():
+    try:
+        # Revalidating is a cheap 304 when nothing changed, and picks up this CLI's own edits
+        items = fetch_inventory()
+        if items is None:
+            return
+        
+        query = input('Filter by name, brand, barcode or category: ').strip().lower()
+        fields = ('product_name', 'brands', 'barcode', 'category')
+        matches = [
+            item for item in items
+            if any(query in str(item.get(field, '')).lower() for field in fields)
+        ]
+        
+        heading(f'Items matching "{query}"')
+        print_all_items(matches)
     except Exception as e:
         print(f'Error: {e}')
 
@@ -217,7 +328,7 @@ def search_openfoodfacts():
 
         print('Searching barcode...')
 
-        response = requests.get(f'https://world.openfoodfacts.net/api/v2/product/{barcode}')
+        response = requests.get(f'{API_base_url}/openfoodfacts/{barcode}')
         if response.status_code == 200:
             product = response.json()
             print(f'Product: {product.get("product_name")}')
@@ -259,6 +370,159 @@ def search_openfoodfacts():
 
 
 
+def operation_request(operation):
+    """Turn a batch operation into (method, path, body)"""
+    if not isinstance(operation, dict):
+        raise ValueError(f'expected a JSON object, got {json.dumps(operation)}')
+
+    op = operation.get('op')
+
+    if op == 'list':
+        return 'GET', '/inventory', None
+    if op == 'get':
+        return 'GET', f'/inventory/{int(operation["id"])}', None
+    if op == 'add':
+        return 'POST', '/inventory', operation['data']
+    if op == 'update':
+        return 'PATCH', f'/inventory/{int(operation["id"])}', operation['data']
+    if op == 'delete':
+        return 'DELETE', f'/inventory/{int(operation["id"])}', None
+    if op == 'search':
+        return 'GET', f'/openfoodfacts/{quote(str(operation["barcode"]), safe="")}', None
+
+    raise ValueError(f'Unknown operation: {op}')
+
+
+def read_operations(lines):
+    """Parse one JSON operation per line, skipping blank lines and # comments.
+
+    Raises ValueError listing every line that isn't valid JSON, so a
+    script with mistakes in it is rejected before anything runs.
+    """
+    operations = []
+    bad_lines = []
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            try:
+                operations.append(json.loads(line))
+            except ValueError as e:
+                bad_lines.append(f'line {number}: {e}')
+
+    if bad_lines:
+        raise ValueError('\n'.join(bad_lines))
+    return operations
+
+
+def make_session(adapter):
+    """A keep-alive session whose connections come from the shared adapter pool"""
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def run_operation(session, index, operation):
+    op = operation.get('op') if isinstance(operation, dict) else None
+    result = {'index': index, 'op': op, 'status': None, 'ok': False}
+    start = time.perf_counter()
+
+    try:
+        method, path, body = operation_request(operation)
+        result['path'] = path
+        response = session.request(method, f'{API_base_url}{path}', json=body)
+        result['status'] = response.status_code
+        result['ok'] = response.status_code < 400
+    except (KeyError, ValueError, TypeError) as e:
+        result['error'] = f'Invalid operation: {e}'
+    except requests.exceptions.RequestException as e:
+        result['error'] = str(e)
+
+    result['latency_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def run_batch(operations, concurrency=1):
+    """Run operations over keep-alive connections and return (results in input order, totals)"""
+    # Session isn't documented as thread-safe, so each worker gets its own.
+    # They all mount one adapter, whose urllib3 pool is thread-safe, so the
+    # keep-alive connections are still shared.
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(concurrency, 1))
+    local = threading.local()
+
+    def run(args):
+        if not hasattr(local, 'session'):
+            local.session = make_session(adapter)
+        return run_operation(local.session, *args)
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(run, enumerate(operations)))
+    else:
+        results = [run(args) for args in enumerate(operations)]
+    elapsed = time.perf_counter() - start
+
+    latencies = [result['latency_ms'] for result in results]
+    totals = {
+        'operations': len(results),
+        'errors': sum(1 for result in results if not result['ok']),
+        'elapsed_s': round(elapsed, 3),
+        'ops_per_s': round(len(results) / elapsed, 1) if elapsed else None,
+        'avg_ms': round(sum(latencies) / len(latencies), 3) if latencies else None,
+        'max_ms': max(latencies) if latencies else None,
+    }
+    return results, totals
+
+
+def print_batch_report(results, totals):
+    print(f"{'#':<6} {'Op':<8} {'Path':<30} {'Status':<8} {'Latency':<10}")
+    print('-' * 70)
+
+    for result in results:
+        status = result['status'] if result['status'] is not None else 'ERR'
+        print(f"{result['index']:<6} {str(result['op']):<8} {result.get('path', ''):<30} {status:<8} {result['latency_ms']:.2f}ms")
+        if 'error' in result:
+            print(f"       {result['error']}")
+
+    print('-' * 70)
+    print(f"Operations: {totals['operations']}  Errors: {totals['errors']}  "
+          f"Elapsed: {totals['elapsed_s']}s  Ops/s: {totals['ops_per_s']}")
+    print(f"Latency avg: {totals['avg_ms']}ms  max: {totals['max_ms']}ms")
+
+
+def batch_command(argv):
+    """Non-interactive mode: python cli.py batch ops.jsonl [--concurrency N] [--json]"""
+    parser = argparse.ArgumentParser(prog='cli.py', description='Food Inventory Management CLI')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    batch = subparsers.add_parser('batch', help='run operations from a file or stdin')
+    batch.add_argument('file', help="JSON lines file of operations, or '-' for stdin")
+    batch.add_argument('--concurrency', type=int, default=1, help='operations in flight at once (default: %(default)s)')
+    batch.add_argument('--json', action='store_true', help='print results and totals as JSON lines')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.file == '-':
+            operations = read_operations(sys.stdin)
+        else:
+            with open(args.file) as f:
+                operations = read_operations(f)
+    except (OSError, ValueError) as e:
+        print(f'Error reading operations from {args.file}:\n{e}')
+        return 1
+
+    results, totals = run_batch(operations, args.concurrency)
+
+    if args.json:
+        for result in results:
+            print(json.dumps(result))
+        print(json.dumps({'totals': totals}))
+    else:
+        print_batch_report(results, totals)
+
+    return 1 if totals['errors'] else 0
+
+
 def display_menu():
     """Display the main menu"""
     print("\n" + "="*70)
@@ -270,7 +534,8 @@ def display_menu():
     print("  4. Update item")
     print("  5. Delete item")
     print("  6. Search OpenFoodFacts database")
-    print("  7. Exit")
+    print("  7. Filter inventory (cached)")
+    print("  8. Exit")
     print("\n" + "-"*70)
 
 
@@ -281,7 +546,7 @@ def main():
     while True:
         display_menu()
         
-        choice = input("  Enter your choice (1-7): ").strip()
+        choice = input("  Enter your choice (1-8): ").strip()
         
         if choice == '1':
             get_inventory()
@@ -302,15 +567,20 @@ def main():
             search_openfoodfacts()
         
         elif choice == '7':
+            filter_inventory()
+        
+        elif choice == '8':
             print('Exiting inventory management system')
             break
         
         else:
-            print("Invalid choice. Please enter a number between 1 and 7.")
+            print("Invalid choice. Please enter a number between 1 and 8.")
         
         input("Press Enter to continue...")
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(batch_command(sys.argv[1:]))
     main()
 
@@ -0,0 +1,187 @@
+"""Offline OpenFoodFacts barcode index.
+
+Imports an OpenFoodFacts JSONL or CSV dump (optionally gzipped) into a single
+file that the API can search without any network calls:
+
+    python openfoodfacts_index.py openfoodfacts-products.jsonl.gz products.idx
+
+File layout:
+    header   magic, record count, index offset
+    data     one compact JSON product per record
+    index    fixed-size (barcode, offset, length) entries sorted by barcode
+
+The index is memory-mapped and binary searched, so a lookup only touches a
+handful of pages.
+"""
+import argparse
+import csv
+import gzip
+import json
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b'OFFIDX1\0'
+HEADER = struct.Struct('<8sQQ')
+KEY_SIZE = 24
+ENTRY = struct.Struct(f'<{KEY_SIZE}sQI')
+
+
+def encode_barcode(barcode):
+    """Return the fixed-width index key for a barcode, or None if it isn't a valid barcode"""
+    if not isinstance(barcode, str):
+        return None
+
+    barcode = barcode.strip()
+    # Only ASCII digits, so nothing is dropped or mangled into another barcode
+    if not barcode.isascii() or not barcode.isdigit() or len(barcode) > KEY_SIZE:
+        return None
+    return barcode.encode('ascii').ljust(KEY_SIZE, b'\0')
+
+
+def normalize_product(product):
+    """Keep only the fields the API returns, with the same defaults as the live lookup"""
+    return {
+        "product_name": product.get('product_name') or 'Unknown',
+        "brands": product.get('brands') or 'Unknown',
+        "category": product.get('categories') or 'Uncategorized',
+    }
+
+
+def open_dump(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def read_dump(path):
+    """Yield product dicts from a JSONL or CSV/TSV dump"""
+    name = path[:-3] if path.endswith('.gz') else path
+
+    with open_dump(path) as f:
+        if name.endswith(('.csv', '.tsv')):
+            csv.field_size_limit(sys.maxsize)
+            first_line = f.readline()
+            # The official OpenFoodFacts "CSV" export is tab separated
+            delimiter = '\t' if '\t' in first_line else ','
+            fieldnames = next(csv.reader([first_line], delimiter=delimiter))
+            yield from csv.DictReader(f, fieldnames=fieldnames, delimiter=delimiter)
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def build_index(dump_path, output_path):
+    """Import a dump into an index file and return the number of products stored.
+
+    Duplicate barcodes keep the last product seen in the dump. The index is
+    written to a temporary file and moved into place when complete, so a
+    failed import never leaves a partial index at `output_path`.
+    """
+    tmp_path = f'{output_path}.tmp'
+
+    try:
+        count = write_index(dump_path, tmp_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return count
+
+
+def write_index(dump_path, path):
+    entries = {}
+
+    with open(path, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, 0, 0))
+
+        for product in read_dump(dump_path):
+            key = encode_barcode(product.get('code', ''))
+            if key is None:
+                continue
+
+            blob = json.dumps(normalize_product(product), separators=(',', ':')).encode('utf-8')
+            entries[key] = (out.tell(), len(blob))
+            out.write(blob)
+
+        index_offset = out.tell()
+        for key in sorted(entries):
+            offset, length = entries[key]
+            out.write(ENTRY.pack(key, offset, length))
+
+        out.seek(0)
+        out.write(HEADER.pack(MAGIC, len(entries), index_offset))
+
+    return len(entries)
+
+
+class BarcodeIndex:
+    """Read-only, memory-mapped view of an index file built by build_index"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, self.count, self._index_offset = HEADER.unpack_from(self._mmap, 0)
+        except struct.error:
+            magic = None
+
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f'{path} is not an OpenFoodFacts index file')
+
+        if self._index_offset < HEADER.size or self._index_offset + self.count * ENTRY.size > len(self._mmap):
+            self._mmap.close()
+            raise ValueError(f'{path} is truncated or corrupt')
+
+    def __len__(self):
+        return self.count
+
+    def _key_at(self, position):
+        start = self._index_offset + position * ENTRY.size
+        return self._mmap[start:start + KEY_SIZE]
+
+    def lookup(self, barcode):
+        """Return the product for a barcode, or None if it is not in the index"""
+        key = encode_barcode(barcode)
+        if key is None:
+            return None
+
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low == self.count or self._key_at(low) != key:
+            return None
+
+        _, offset, length = ENTRY.unpack_from(self._mmap, self._index_offset + low * ENTRY.size)
+        product = json.loads(self._mmap[offset:offset + length])
+        product['barcode'] = barcode
+        return product
+
+    def close(self):
+        self._mmap.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import an OpenFoodFacts dump into an offline barcode index')
+    parser.add_argument('dump', help='OpenFoodFacts .jsonl or .csv dump, optionally .gz compressed')
+    parser.add_argument('output', help='index file to write')
+    args = parser.parse_args(argv)
+
+    count = build_index(args.dump, args.output)
+    print(f'Indexed {count} products into {args.output}')
+
+
+if __name__ == '__main__':
+    main()
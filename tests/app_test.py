@@ -1,7 +1,12 @@
 import pytest
 import json
+import queue
+import requests
+import threading
 from unittest.mock import patch, MagicMock
-from app import app, inventory
+from concurrent.futures import ThreadPoolExecutor
+import app as app_module
+from app import app, inventory, enrichment_queue, enrichment_pending, enrichment_results, allocate_id
 
 
 @pytest.fixture
@@ -15,6 +20,8 @@ def client():
 @pytest.fixture(autouse=True)
 def reset_inventory():
     """Reset inventory to initial state before each test"""
+    enrichment_pending.clear()
+    enrichment_results.clear()
     inventory.clear()
     inventory.extend([
         {
@@ -116,4 +123,219 @@ def test_openfoodfacts_endpoint(mock_get, client):
     mock_get.return_value = mock_response
     
     response = client.get('/openfoodfacts/123456789')
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+@patch('app.requests.get')
+def test_openfoodfacts_offline_index(mock_get, client):
+    """Test OpenFoodFacts endpoint is served from the offline index without a live call"""
+    mock_index = MagicMock()
+    mock_index.lookup.return_value = {
+        'product_name': 'Offline Product',
+        'brands': 'Offline Brand',
+        'barcode': '123456789',
+        'category': 'Offline Category'
+    }
+
+    with patch('app.offline_index', mock_index):
+        response = client.get('/openfoodfacts/123456789')
+
+    assert response.status_code == 200
+    assert json.loads(response.data)['product_name'] == 'Offline Product'
+    mock_get.assert_not_called()
+
+
+@patch('app.lookup_openfoodfacts')
+def test_add_barcode_only_item(mock_fetch, client):
+    """Test barcode-only items are accepted and enriched in the background"""
+    mock_fetch.return_value = {
+        'product_name': 'Scanned Product',
+        'brands': 'Scanned Brand',
+        'barcode': '123456789',
+        'category': 'Snacks'
+    }
+    new_item = {"barcode": "123456789", "quantity": 3, "price": 2.49, "brands": "Store Brand"}
+    response = client.post(
+        '/inventory',
+        data=json.dumps(new_item),
+        content_type='application/json'
+    )
+    assert response.status_code == 202
+    item_id = json.loads(response.data)['id']
+
+    enrichment_queue.join()
+
+    data = json.loads(client.get(f'/inventory/{item_id}').data)
+    assert data['product_name'] == 'Scanned Product'
+    assert data['category'] == 'Snacks'
+    # Fields sent with the item are kept
+    assert data['brands'] == 'Store Brand'
+
+    status = json.loads(client.get(f'/inventory/{item_id}/enrichment').data)
+    assert status['status'] == 'done'
+
+
+@patch('app.lookup_openfoodfacts', return_value=None)
+def test_barcode_only_item_not_found(mock_fetch, client):
+    """Test enrichment status when the barcode is unknown"""
+    response = client.post(
+        '/inventory',
+        data=json.dumps({"barcode": "000", "quantity": 1, "price": 1.0}),
+        content_type='application/json'
+    )
+    item_id = json.loads(response.data)['id']
+
+    enrichment_queue.join()
+
+    status = json.loads(client.get(f'/inventory/{item_id}/enrichment').data)
+    assert status['status'] == 'not_found'
+
+
+def test_barcode_only_item_queue_full(client):
+    """Test barcode-only items are rejected when the enrichment queue is full"""
+    full_queue = MagicMock()
+    full_queue.put_nowait.side_effect = queue.Full
+
+    with patch('app.enrichment_queue', full_queue):
+        response = client.post(
+            '/inventory',
+            data=json.dumps({"barcode": "123456789", "quantity": 1, "price": 1.0}),
+            content_type='application/json'
+        )
+
+    assert response.status_code == 503
+    assert len(json.loads(client.get('/inventory').data)) == 2
+
+
+def test_enrichment_status_not_requested(client):
+    """Test enrichment status of an item added with a name"""
+    response = client.get('/inventory/1/enrichment')
+    assert response.status_code == 200
+    assert json.loads(response.data)['status'] == 'not_requested'
+
+
+def test_get_all_inventory_etag(client):
+    """Test clients can revalidate the inventory with If-None-Match"""
+    response = client.get('/inventory')
+    etag = response.headers['ETag']
+
+    response = client.get('/inventory', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    client.patch(
+        '/inventory/1',
+        data=json.dumps({"quantity": 1}),
+        content_type='application/json'
+    )
+    response = client.get('/inventory', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+@patch('app.requests.get', side_effect=requests.exceptions.Timeout('timed out'))
+def test_barcode_only_item_lookup_failed(mock_get, client):
+    """Test a failed OpenFoodFacts request is reported as failed, not as not found"""
+    response = client.post(
+        '/inventory',
+        data=json.dumps({"barcode": "123456789", "quantity": 1, "price": 1.0}),
+        content_type='application/json'
+    )
+    item_id = json.loads(response.data)['id']
+
+    with patch('sys.stdout'):
+        enrichment_queue.join()
+
+    status = json.loads(client.get(f'/inventory/{item_id}/enrichment').data)
+    assert status['status'] == 'failed'
+    assert mock_get.call_args.kwargs['timeout'] > 0
+
+
+@patch('app.requests.get')
+def test_barcode_only_item_rate_limited(mock_get, client):
+    """Test a rate-limited OpenFoodFacts response is reported as failed, not as not found"""
+    mock_get.return_value = MagicMock(status_code=429)
+    response = client.post(
+        '/inventory',
+        data=json.dumps({"barcode": "123456789", "quantity": 1, "price": 1.0}),
+        content_type='application/json'
+    )
+    item_id = json.loads(response.data)['id']
+
+    with patch('sys.stdout'):
+        enrichment_queue.join()
+
+    status = json.loads(client.get(f'/inventory/{item_id}/enrichment').data)
+    assert status['status'] == 'failed'
+
+
+@patch('app.lookup_openfoodfacts')
+def test_enrichment_error_keeps_finished_status(mock_lookup, client):
+    """Test an error partway through a batch doesn't mark finished items as failed"""
+    mock_lookup.return_value = {
+        'product_name': 'Scanned Product',
+        'brands': 'Scanned Brand',
+        'barcode': '123456789',
+        'category': 'Snacks'
+    }
+    main_thread = threading.current_thread()
+    real_inventory_changed = app_module.inventory_changed
+
+    def fail_in_worker():
+        # Requests run on the test's thread; only the enrichment worker fails
+        if threading.current_thread() is not main_thread:
+            raise RuntimeError('boom')
+        real_inventory_changed()
+
+    with patch('app.inventory_changed', side_effect=fail_in_worker):
+        response = client.post(
+            '/inventory',
+            data=json.dumps({"barcode": "123456789", "quantity": 1, "price": 1.0}),
+            content_type='application/json'
+        )
+        item_id = json.loads(response.data)['id']
+        with patch('sys.stdout'):
+            enrichment_queue.join()
+
+    status = json.loads(client.get(f'/inventory/{item_id}/enrichment').data)
+    assert status['status'] == 'done'
+
+
+@patch('app.lookup_openfoodfacts', return_value=None)
+def test_enrichment_status_forgotten_on_delete(mock_lookup, client):
+    """Test an item's enrichment status is dropped when the item is deleted"""
+    response = client.post(
+        '/inventory',
+        data=json.dumps({"barcode": "000", "quantity": 1, "price": 1.0}),
+        content_type='application/json'
+    )
+    item_id = json.loads(response.data)['id']
+    enrichment_queue.join()
+    assert item_id in enrichment_results
+
+    client.delete(f'/inventory/{item_id}')
+    assert item_id not in enrichment_results
+    assert item_id not in enrichment_pending
+
+
+@patch('app.ENRICHMENT_STATUS_LIMIT', 2)
+@patch('app.lookup_openfoodfacts', return_value=None)
+def test_enrichment_status_is_bounded(mock_lookup, client):
+    """Test only the most recent finished statuses are kept"""
+    item_ids = []
+    for barcode in ['001', '002', '003']:
+        response = client.post(
+            '/inventory',
+            data=json.dumps({"barcode": barcode, "quantity": 1, "price": 1.0}),
+            content_type='application/json'
+        )
+        item_ids.append(json.loads(response.data)['id'])
+        enrichment_queue.join()
+
+    assert list(enrichment_results) == item_ids[1:]
+
+
+def test_allocate_id_is_unique_under_concurrency():
+    """Test concurrent requests never get the same item id"""
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(lambda _: allocate_id(), range(1000)))
+    assert len(set(ids)) == 1000
@@ -0,0 +1,55 @@
+import pytest
+import app
+from benchmark import make_items, parse_args, percentile, run_size
+
+
+def test_make_items_is_reproducible():
+    """Test seeded items are identical between runs"""
+    assert make_items(50, seed=1) == make_items(50, seed=1)
+    assert [item['id'] for item in make_items(3)] == [1, 2, 3]
+
+
+def test_percentile():
+    """Test nearest-rank percentiles"""
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) is None
+
+
+def test_run_size_drives_every_route():
+    """Test a small run hits every route without errors in separate server processes"""
+    inventory = list(app.inventory)
+    result = run_size(20, concurrency=2, requests_per_route=5, list_requests=2)
+
+    assert result['size'] == 20
+    assert len(result['routes']) == 9
+    for stats in result['routes'].values():
+        assert stats['errors'] == 0
+        assert stats['p50_ms'] <= stats['p99_ms']
+    assert result['enrichment']['items'] == 5
+    assert result['enrichment']['pending'] == 0
+    assert result['server_peak_memory_mb'] > 0
+    assert app.inventory == inventory
+
+
+@pytest.mark.parametrize('argv', [
+    ['--sizes', '0'],
+    ['--sizes', '10,-5'],
+    ['--sizes', 'ten'],
+    ['--concurrency', '0'],
+    ['--requests', '0'],
+    ['--list-requests', '-1'],
+])
+def test_parse_args_rejects_non_positive_values(argv, capsys):
+    """Test invalid load settings are rejected before any server starts"""
+    with pytest.raises(SystemExit):
+        parse_args(argv)
+
+
+def test_parse_args_defaults():
+    """Test the default sizes and load settings"""
+    args = parse_args([])
+    assert args.sizes == [10000, 100000, 1000000]
+    assert args.concurrency == 8
@@ -1,4 +1,6 @@
 import pytest
+import requests
+import json
 from unittest.mock import patch, MagicMock
 from io import StringIO
 from cli import (
@@ -9,10 +11,24 @@ from cli import (
     add_new_item,
     update_item,
     delete_item,
-    search_openfoodfacts
+    search_openfoodfacts,
+    read_operations,
+    run_batch,
+    batch_command,
+    fetch_inventory,
+    filter_inventory,
+    load_cache,
+    save_cache
 )
 
 
+@pytest.fixture(autouse=True)
+def inventory_cache(tmp_path):
+    """Keep the local inventory cache out of the user's home directory"""
+    with patch('cli.CACHE_PATH', str(tmp_path / 'cache.json')), patch('cli.inventory_cache', None):
+        yield
+
+
 def test_print_all_items():
     """Test printing inventory items"""
     items = [
@@ -41,6 +57,7 @@ def test_get_inventory(mock_print, mock_get):
     mock_response = MagicMock()
     mock_response.status_code = 200
     mock_response.json.return_value = [{"id": 1, "product_name": "Test"}]
+    mock_response.headers = {}
     mock_get.return_value = mock_response
     
     get_inventory()
@@ -136,4 +153,206 @@ def test_search_openfoodfacts(mock_input, mock_post, mock_get):
     with patch('sys.stdout', new=StringIO()):
         search_openfoodfacts()
     
-    assert mock_get.call_count == 1
\ No newline at end of file
+    assert mock_get.call_count == 1
+
+
+def test_read_operations():
+    """Test parsing batch operations"""
+    lines = ['# restock', '{"op": "list"}', '', '{"op": "delete", "id": 2}']
+    assert read_operations(lines) == [{"op": "list"}, {"op": "delete", "id": 2}]
+
+
+@patch('cli.make_session')
+def test_run_batch(mock_make_session):
+    """Test running batch operations over keep-alive sessions"""
+    mock_session = MagicMock()
+    mock_session.request.return_value = MagicMock(status_code=200)
+    operations = [
+        {"op": "get", "id": 1},
+        {"op": "update", "id": 1, "data": {"quantity": 5}},
+        {"op": "bogus"}
+    ]
+
+    mock_make_session.return_value = mock_session
+    results, totals = run_batch(operations, concurrency=2)
+
+    assert [result['index'] for result in results] == [0, 1, 2]
+    assert results[0]['ok'] and results[1]['ok']
+    assert not results[2]['ok']
+    assert totals['operations'] == 3
+    assert totals['errors'] == 1
+    mock_session.request.assert_any_call('PATCH', 'http://localhost:8000/inventory/1', json={"quantity": 5})
+    assert mock_session.request.call_count == 2
+
+
+@patch('cli.make_session')
+def test_batch_command(mock_make_session, tmp_path):
+    """Test the batch subcommand reads a file and reports totals"""
+    mock_session = MagicMock()
+    mock_session.request.return_value = MagicMock(status_code=201)
+    mock_make_session.return_value = mock_session
+    ops_file = tmp_path / 'ops.jsonl'
+    ops_file.write_text('{"op": "add", "data": {"product_name": "Test", "quantity": 1, "price": 1.0}}\n')
+
+    with patch('sys.stdout', new=StringIO()) as fake_out:
+        exit_code = batch_command(['batch', str(ops_file), '--json'])
+        output = fake_out.getvalue()
+
+    assert exit_code == 0
+    assert '"operations": 1' in output
+
+
+def test_print_all_items_pages():
+    """Test large inventories are printed one page at a time"""
+    items = [
+        {"id": i, "product_name": f"Product {i}", "brands": "Brand", "quantity": 1, "price": 1.0}
+        for i in range(1, 6)
+    ]
+    with patch('builtins.input', return_value='q') as mock_input, \
+            patch('sys.stdout', new=StringIO()) as fake_out:
+        print_all_items(items, page_size=2)
+        output = fake_out.getvalue()
+
+    mock_input.assert_called_once()
+    assert 'Product 2' in output
+    assert 'Product 3' not in output
+
+
+@patch('cli.requests.get')
+def test_fetch_inventory_revalidates_cache(mock_get):
+    """Test the cached inventory is reused when the server answers 304"""
+    items = [{"id": 1, "product_name": "Cached"}]
+    first = MagicMock(status_code=200, headers={'ETag': '"abc-1"'})
+    first.json.return_value = items
+    mock_get.side_effect = [first, MagicMock(status_code=304)]
+
+    assert fetch_inventory() == items
+    assert fetch_inventory() == items
+    assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"abc-1"'}
+
+
+@patch('cli.requests.get')
+@patch('cli.print_all_items')
+@patch('builtins.input', return_value='dairy')
+def test_filter_inventory(mock_input, mock_print, mock_get):
+    """Test filtering revalidates the cache and reuses it on 304"""
+    response = MagicMock(status_code=200, headers={'ETag': '"abc-1"'})
+    response.json.return_value = [
+        {"id": 1, "product_name": "Milk", "category": "Dairy"},
+        {"id": 2, "product_name": "Bread", "category": "Bakery"}
+    ]
+    mock_get.side_effect = [response, MagicMock(status_code=304)]
+    fetch_inventory()
+
+    with patch('sys.stdout', new=StringIO()):
+        filter_inventory()
+
+    assert mock_get.call_count == 2
+    assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"abc-1"'}
+    mock_print.assert_called_once_with([{"id": 1, "product_name": "Milk", "category": "Dairy"}])
+
+
+@patch('cli.make_session')
+def test_run_batch_non_object_operations(mock_make_session):
+    """Test operations that aren't JSON objects are reported instead of aborting the batch"""
+    mock_session = MagicMock()
+    mock_session.request.return_value = MagicMock(status_code=200)
+    mock_make_session.return_value = mock_session
+
+    results, totals = run_batch(["list", [1], 5, {"op": "list"}])
+
+    assert [result['ok'] for result in results] == [False, False, False, True]
+    assert 'Invalid operation' in results[0]['error']
+    assert totals['errors'] == 3
+
+
+@patch('cli.make_session')
+def test_run_batch_quotes_barcode(mock_make_session):
+    """Test search barcodes are URL-quoted"""
+    mock_session = MagicMock()
+    mock_session.request.return_value = MagicMock(status_code=200)
+    mock_make_session.return_value = mock_session
+
+    run_batch([{"op": "search", "barcode": "12/3 4"}])
+
+    mock_session.request.assert_called_once_with('GET', 'http://localhost:8000/openfoodfacts/12%2F3%204', json=None)
+
+
+def test_read_operations_reports_bad_lines():
+    """Test malformed lines are reported with their line numbers"""
+    with pytest.raises(ValueError) as error:
+        read_operations(['{"op": "list"}', '{oops', '', 'not json'])
+
+    assert 'line 2' in str(error.value)
+    assert 'line 4' in str(error.value)
+
+
+@patch('cli.make_session')
+def test_batch_command_bad_file(mock_make_session, tmp_path):
+    """Test a file with a malformed line exits non-zero without running anything"""
+    ops_file = tmp_path / 'ops.jsonl'
+    ops_file.write_text('{"op": "list"}\n{oops\n')
+
+    with patch('sys.stdout', new=StringIO()) as fake_out:
+        exit_code = batch_command(['batch', str(ops_file)])
+        output = fake_out.getvalue()
+
+    assert exit_code == 1
+    assert 'line 2' in output
+    mock_make_session.assert_not_called()
+
+
+@patch('cli.requests.get')
+def test_fetch_inventory_ignores_malformed_cache(mock_get, tmp_path):
+    """Test a cache file that isn't an object is a miss and gets overwritten"""
+    cache_file = tmp_path / 'cache.json'
+    cache_file.write_text('[1, 2, 3]')
+    response = MagicMock(status_code=200, headers={'ETag': '"abc-1"'})
+    response.json.return_value = [{"id": 1}]
+    mock_get.return_value = response
+
+    assert load_cache() is None
+    assert fetch_inventory() == [{"id": 1}]
+    assert mock_get.call_args.kwargs['headers'] == {}
+    assert json.loads(cache_file.read_text())['etag'] == '"abc-1"'
+
+
+def test_save_cache_unserializable():
+    """Test a cache that can't be written is reported instead of raising"""
+    with patch('sys.stdout', new=StringIO()) as fake_out:
+        save_cache('"abc-1"', [object()])
+        output = fake_out.getvalue()
+
+    assert 'Could not save inventory cache' in output
+
+
+@patch('cli.requests.get', side_effect=requests.exceptions.ConnectionError('down'))
+@patch('cli.print_all_items')
+@patch('builtins.input', return_value='milk')
+def test_inventory_uses_cache_when_server_down(mock_input, mock_print, mock_get):
+    """Test viewing and filtering fall back to the cached copy when the server is unreachable"""
+    items = [
+        {"id": 1, "product_name": "Milk", "category": "Dairy"},
+        {"id": 2, "product_name": "Bread", "category": "Bakery"}
+    ]
+    with patch('sys.stdout', new=StringIO()):
+        save_cache('"abc-1"', items)
+
+    with patch('sys.stdout', new=StringIO()) as fake_out:
+        get_inventory()
+        filter_inventory()
+        output = fake_out.getvalue()
+
+    assert 'showing cached copy' in output
+    assert mock_print.call_args_list[0].args == (items,)
+    assert mock_print.call_args_list[1].args == ([items[0]],)
+
+
+@patch('cli.requests.get', side_effect=requests.exceptions.ConnectionError('down'))
+def test_inventory_server_down_without_cache(mock_get):
+    """Test the connection error is still reported when there is no cache"""
+    with patch('sys.stdout', new=StringIO()) as fake_out:
+        get_inventory()
+        output = fake_out.getvalue()
+
+    assert 'Error: down' in output
@@ -0,0 +1,104 @@
+import gzip
+import json
+import pytest
+from openfoodfacts_index import BarcodeIndex, build_index
+
+
+PRODUCTS = [
+    {"code": "3017620422003", "product_name": "Nutella", "brands": "Ferrero", "categories": "Spreads"},
+    {"code": "025293600577", "product_name": "Almond Milk", "brands": "Silk", "categories": "Beverages"},
+    {"code": "0001", "product_name": "", "brands": "", "categories": ""},
+    {"code": "", "product_name": "No barcode"},
+    {"code": None, "product_name": "Null barcode"},
+    {"code": "12\u00e93", "product_name": "Not a barcode"},
+]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    """Build an index from a small gzipped JSONL dump"""
+    dump = tmp_path / 'products.jsonl.gz'
+    with gzip.open(dump, 'wt', encoding='utf-8') as f:
+        for product in PRODUCTS:
+            f.write(json.dumps(product) + '\n')
+
+    path = tmp_path / 'products.idx'
+    assert build_index(str(dump), str(path)) == 3
+    return str(path)
+
+
+def test_lookup_hit(index_path):
+    """Test looking up a barcode in the index"""
+    index = BarcodeIndex(index_path)
+    assert len(index) == 3
+    assert index.lookup('3017620422003') == {
+        "product_name": "Nutella",
+        "brands": "Ferrero",
+        "barcode": "3017620422003",
+        "category": "Spreads"
+    }
+    index.close()
+
+
+def test_lookup_defaults_and_miss(index_path):
+    """Test empty fields get defaults and unknown barcodes return None"""
+    index = BarcodeIndex(index_path)
+    assert index.lookup('0001')['category'] == 'Uncategorized'
+    assert index.lookup('999') is None
+    assert index.lookup('') is None
+    index.close()
+
+
+def test_build_index_from_tsv(tmp_path):
+    """Test importing the tab separated CSV export"""
+    dump = tmp_path / 'products.csv'
+    dump.write_text('code\tproduct_name\tbrands\tcategories\n'
+                    '013093502006\tWhole Grain Bread\tBread\tBakery\n')
+    path = tmp_path / 'products.idx'
+    build_index(str(dump), str(path))
+
+    index = BarcodeIndex(str(path))
+    assert index.lookup('013093502006')['product_name'] == 'Whole Grain Bread'
+    index.close()
+
+
+def test_rejects_other_files(tmp_path):
+    """Test opening a file that isn't an index"""
+    path = tmp_path / 'not_an_index'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        BarcodeIndex(str(path))
+
+
+def test_rejects_invalid_barcodes(index_path):
+    """Test null and non-digit codes are skipped instead of indexed under a mangled key"""
+    index = BarcodeIndex(index_path)
+    assert index.lookup('None') is None
+    assert index.lookup('123') is None
+    assert index.lookup('12\u00e93') is None
+    index.close()
+
+
+def test_rejects_truncated_index(index_path, tmp_path):
+    """Test a partly written index is refused on open"""
+    with open(index_path, 'rb') as f:
+        data = f.read()
+    truncated = tmp_path / 'truncated.idx'
+    truncated.write_bytes(data[:-10])
+
+    with pytest.raises(ValueError):
+        BarcodeIndex(str(truncated))
+
+
+def test_build_index_failure_keeps_existing_index(index_path, tmp_path):
+    """Test a failed import leaves the previous index in place"""
+    dump = tmp_path / 'broken.jsonl'
+    dump.write_text('{"code": "123"}\nnot json\n')
+
+    with pytest.raises(ValueError):
+        build_index(str(dump), index_path)
+
+    index = BarcodeIndex(index_path)
+    assert len(index) == 3
+    index.close()
+    assert not (tmp_path / 'products.idx.tmp').exists()